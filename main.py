@@ -1,15 +1,35 @@
 import argparse
+import asyncio
 import sys
 import spade
 from src.config import config
-from src.utils.logger import logger
+from src.utils.logger import configure_logging, logger
 from src.agent.coordinator import launch_agent_coordinator
 from src.agent.taxi import launch_agent_taxi
 from src.services.openfire_api import openfire_api
 
+try:
+    import uvloop
+except ImportError:  # Opcional: no disponible en Windows
+    uvloop = None
+
+def delete_stale_users():
+    """Remove every Openfire user except the administrator"""
+    users = openfire_api.list_users()
+    asyncio.run(openfire_api.delete_users([user for user in users if user != "admin"]))
+
+def positive_int(value: str) -> int:
+    """argparse type: integer >= 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {value}")
+    return number
+
 def main():
     """Main entry point"""
-    
+
+    configure_logging()
+
     parser = argparse.ArgumentParser(description="Taxi Multi-Agent System")
     parser.add_argument("--host", type=str, required=True, help="Hostname identifier")
     parser.add_argument(
@@ -18,10 +38,24 @@ def main():
         default=10,
         help="Number of agents to spawn on this host",
     )
+    parser.add_argument(
+        "--spawn-concurrency",
+        type=positive_int,
+        help="Maximum number of agents started concurrently",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Remove existing Openfire users before starting the coordinator",
+    )
     parser.add_argument("--openfire-host", type=str, help="Openfire server hostname")
     parser.add_argument("--openfire-port", type=int, help="Openfire server port")
     parser.add_argument(
-        "--agent-type", type=str, help="Agent Type (Taxi / Coordinator)"
+        "--agent-type",
+        type=str.lower,
+        choices=["taxi", "coordinator", "cleanup"],
+        default="coordinator",
+        help="Agent Type (Taxi / Coordinator), or cleanup to only remove Openfire users",
     )
 
     args = parser.parse_args()
@@ -33,25 +67,32 @@ def main():
         config.openfire_host = args.openfire_host
     if args.openfire_port:
         config.openfire_port = args.openfire_port
+    if args.spawn_concurrency is not None:
+        config.spawn_concurrency = args.spawn_concurrency
 
     print(f"Openfire server: {config.openfire_host}:{config.openfire_port}")
     print(f"Grid size: {config.grid_width}x{config.grid_height}")
 
     try:
         if args.agent_type == "taxi":
+            if uvloop:
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
             result = spade.run(launch_agent_taxi(args.agent_count))
             sys.exit(result)
+        elif args.agent_type == "cleanup":
+            delete_stale_users()
         else:
-            users = openfire_api.list_users()
-            for user in users:
-                if user != "admin":
-                    openfire_api.delete_user(user)
+            # Los usuarios existentes se reutilizan (409) salvo que se pida --fresh
+            if args.fresh:
+                delete_stale_users()
             launch_agent_coordinator()
     except KeyboardInterrupt:
         print("\nShutdown requested by user")
     except Exception as e:
         logger.error(f"Fatal error: {e}")
         sys.exit(1)
+    finally:
+        openfire_api.close()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
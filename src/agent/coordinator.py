@@ -1,8 +1,7 @@
-import asyncio
 import json
 import random
 import traceback
-from typing import Dict
+from typing import Dict, Set
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour, PeriodicBehaviour
 from spade.message import Message
@@ -27,8 +26,21 @@ class CoordinatorAgent(Agent):
     def __init__(self, jid: str, password: str, grid: GridNetwork):
         super().__init__(jid, password)
         self.grid = grid
+        # La grilla es estática: se serializa una sola vez para todas las respuestas
+        self.grid_info_body = json.dumps(grid.to_dict())
         self.taxis: Dict[str, TaxiInfo] = {}
         self.passengers: Dict[str, PassengerInfo] = {}
+        # Índices mantenidos en cada cambio de estado: evitan recorrer taxis/pasajeros
+        self.idle_taxi_ids: Set[str] = set()
+        self.waiting_passenger_ids: Set[str] = set()
+        # Pasajeros en espera sin taxi asignado (subconjunto de waiting_passenger_ids)
+        self.unassigned_passenger_ids: Set[str] = set()
+        # Hay que volver a resolver: cambió algún conjunto o la última ronda asignó algo
+        self.assignment_dirty = True
+        # Pasajero aceptado por cada taxi y aún no recogido (assignment_accepted)
+        self.pending_pickups: Dict[str, str] = {}
+        # Contador de cambios visibles: la GUI solo redibuja cuando avanza
+        self.version = 0
         self.solver = ConstraintSolver()
         self.passenger_counter = 0
 
@@ -50,7 +62,9 @@ class CoordinatorAgent(Agent):
         self.add_behaviour(comm_behaviour)
 
         # Comportamiento de logica de pasajeros
-        passengers_behaviour = self.PassengersBehaviour()
+        passengers_behaviour = self.PassengersBehaviour(
+            period=config.passenger_wave_interval
+        )
         self.add_behaviour(passengers_behaviour)
 
     class AssignmentBehaviour(PeriodicBehaviour):
@@ -59,25 +73,31 @@ class CoordinatorAgent(Agent):
         async def run(self):
             coordinator: "CoordinatorAgent" = self.agent  # type: ignore
 
-            if not coordinator.taxis or not coordinator.passengers:
+            # Nada cambió desde una ronda sin asignaciones (mismos taxis libres, que no
+            # se movieron con pasajeros por asignar, y mismos pasajeros): no resolver de nuevo
+            if not coordinator.assignment_dirty:
+                return
+            coordinator.assignment_dirty = False
+
+            if not coordinator.idle_taxi_ids or not coordinator.unassigned_passenger_ids:
                 return
 
-            # Obtener listas actuales
-            taxi_list = list(coordinator.taxis.values())
+            # Obtener listas actuales (solo taxis libres y pasajeros en espera)
+            taxi_list = [coordinator.taxis[t] for t in coordinator.idle_taxi_ids]
             passenger_list = [
-                p
-                for p in coordinator.passengers.values()
-                if p.state == PassengerState.WAITING
+                coordinator.passengers[p] for p in coordinator.waiting_passenger_ids
             ]
 
-            if not passenger_list:
-                return
-
             # Resolver asignaciones
             assignments = coordinator.solver.solve_assignment(taxi_list, passenger_list)
 
             logger.info(f"Assignments found: {assignments}")
 
+            # La distancia progresiva se detiene en el primer radio con asignaciones:
+            # pueden quedar pares a mayor distancia para la siguiente ronda
+            if assignments:
+                coordinator.assignment_dirty = True
+
             # Enviar asignaciones a taxis
             for taxi_id, passenger_id in assignments.items():
                 await self._send_assignment_message(taxi_id, passenger_id)
@@ -113,6 +133,8 @@ class CoordinatorAgent(Agent):
 
             # Marcar asignación pendiente
             passenger.assigned_taxi_id = taxi_id
+            coordinator.unassigned_passenger_ids.discard(passenger_id)
+            coordinator.idle_taxi_ids.discard(taxi_id)
 
             logger.info(
                 f"Sent assignment: {taxi_id} -> {passenger_id} at ({passenger.pickup_position.x}, {passenger.pickup_position.y}) -> ({passenger.dropoff_position.x}, {passenger.dropoff_position.y})"
@@ -146,17 +168,7 @@ class CoordinatorAgent(Agent):
                     response = Message(to=msg.sender)
                     response.set_metadata("performative", "inform")
                     response.set_metadata("type", "grid_info")
-                    
-                    # Convertir grid a dict manualmente
-                    grid_dict = {
-                        "width": coordinator.grid.width,
-                        "height": coordinator.grid.height,
-                        "intersections": [
-                            {"x": pos.x, "y": pos.y} 
-                            for pos in coordinator.grid.intersections
-                        ]
-                    }
-                    response.body = json.dumps(grid_dict)
+                    response.body = coordinator.grid_info_body
                     await self.send(response)
 
                 if msg_type == "get_taxi_info":
@@ -166,8 +178,9 @@ class CoordinatorAgent(Agent):
                     response.set_metadata("performative", "inform")
                     response.set_metadata("type", "taxi_info")
                     
-                    # Obtener información del taxi de forma segura
-                    taxi_id = str(msg.body) if msg.body else ""
+                    # El taxi envía {"taxi_id": ...} codificado en JSON
+                    request = json.loads(msg.body) if msg.body else {}
+                    taxi_id = request.get("taxi_id", "")
                     taxi_info = coordinator.taxis.get(taxi_id)
                     
                     if taxi_info:
@@ -251,24 +264,54 @@ class CoordinatorAgent(Agent):
                         speed=data.get("speed", 1.0),
                     )
 
+                    previous = coordinator.taxis.get(taxi_info.taxi_id)
                     coordinator.taxis[taxi_info.taxi_id] = taxi_info
+                    coordinator.version += 1
+                    is_idle = state == TaxiState.IDLE
+                    if is_idle != (taxi_info.taxi_id in coordinator.idle_taxi_ids):
+                        if is_idle:
+                            coordinator.idle_taxi_ids.add(taxi_info.taxi_id)
+                        else:
+                            coordinator.idle_taxi_ids.discard(taxi_info.taxi_id)
+                        coordinator.assignment_dirty = True
+                    elif (
+                        is_idle
+                        and coordinator.unassigned_passenger_ids
+                        and (previous is None or previous.position != position)
+                    ):
+                        # Un taxi libre que patrulla puede entrar en rango de un
+                        # pasajero que sigue sin asignar: volver a resolver
+                        coordinator.assignment_dirty = True
+
+                elif msg_type == "assignment_accepted":
+                    # El taxi confirmó la asignación: recordar a quién debe recoger
+                    data = json.loads(msg.body)
+                    taxi_id = data.get("taxi_id")
+                    passenger_id = data.get("passenger_id")
+                    if taxi_id and passenger_id:
+                        coordinator.pending_pickups[taxi_id] = passenger_id
 
                 elif msg_type == "passenger_picked_up":
                     # Taxi notifica que recogió pasajero
                     data = json.loads(msg.body)
                     taxi_id = data.get("taxi_id")
-                    if taxi_id:
-                        # Buscar pasajero asignado a este taxi
-                        for p in coordinator.passengers.values():
-                            if (
-                                p.assigned_taxi_id == taxi_id
-                                and p.state == PassengerState.WAITING
-                            ):
-                                p.state = PassengerState.PICKED_UP
-                                logger.info(
-                                    f"Passenger {p.passenger_id} picked up by taxi {taxi_id}"
-                                )
-                                break
+                    # Pasajero asignado a este taxi (búsqueda directa, sin recorrer pasajeros)
+                    p = coordinator.passengers.get(
+                        coordinator.pending_pickups.pop(taxi_id, None)
+                    )
+                    if (
+                        p
+                        and p.assigned_taxi_id == taxi_id
+                        and p.state == PassengerState.WAITING
+                    ):
+                        p.state = PassengerState.PICKED_UP
+                        coordinator.waiting_passenger_ids.discard(p.passenger_id)
+                        coordinator.unassigned_passenger_ids.discard(p.passenger_id)
+                        coordinator.assignment_dirty = True
+                        coordinator.version += 1
+                        logger.info(
+                            f"Passenger {p.passenger_id} picked up by taxi {taxi_id}"
+                        )
 
                 elif msg_type == "passenger_delivered":
                     # Pasajero entregado, crear nuevo pasajero
@@ -279,6 +322,9 @@ class CoordinatorAgent(Agent):
                             PassengerState.DELIVERED
                         )
                         del coordinator.passengers[passenger_id]
+                        coordinator.waiting_passenger_ids.discard(passenger_id)
+                        coordinator.unassigned_passenger_ids.discard(passenger_id)
+                        coordinator.version += 1
                         logger.info(f"Passenger {passenger_id} delivered successfully")
 
             except Exception as e:
@@ -286,21 +332,30 @@ class CoordinatorAgent(Agent):
                 logger.error(f"Message body: {msg.body}")
                 logger.error(f"Message metadata: {msg.metadata}")
 
-    class PassengersBehaviour(CyclicBehaviour):
+    class PassengersBehaviour(PeriodicBehaviour):
+        """Genera una oleada de pasajeros en cada periodo"""
+
         async def run(self):
-            while True:
-                self._generate_initial_passengers()
-                await asyncio.sleep(15)
+            self._generate_initial_passengers()
 
         def _generate_initial_passengers(self):
-            """Genera 4 pasajeros iniciales"""
-            for i in range(4):
-                self._create_new_passenger()
+            """Genera la oleada de pasajeros iniciales"""
+            coordinator: "CoordinatorAgent" = self.agent  # type: ignore
+
+            # Muestrear de una vez origen y destino de todos los pasajeros
+            count = config.initial_passengers
+            positions = coordinator.grid.get_random_intersections(2 * count)
+            for i in range(count):
+                self._create_new_passenger(
+                    pickup=positions[2 * i], dropoff=positions[2 * i + 1]
+                )
 
         def _create_new_passenger(
             self,
             is_disabled=False,
             price=10.0,
+            pickup=None,
+            dropoff=None,
         ):
             """Crea un nuevo pasajero: normal o discapacitado"""
             coordinator: "CoordinatorAgent" = self.agent  # type: ignore
@@ -309,15 +364,13 @@ class CoordinatorAgent(Agent):
             coordinator.passenger_counter += 1
 
             # Generar posiciones aleatorias con distancia mínima
-            pickup = coordinator.grid.get_random_intersection()
-            dropoff = coordinator.grid.get_random_intersection()
+            pickup = pickup or coordinator.grid.get_random_intersection()
+            dropoff = dropoff or coordinator.grid.get_random_intersection()
 
-            # Asegurar distancia mínima entre pickup y dropoff
-            max_attempts = 10
-            attempts = 0
-            while pickup.manhattan_distance(dropoff) < 5 and attempts < max_attempts:
-                dropoff = coordinator.grid.get_random_intersection()
-                attempts += 1
+            # Asegurar distancia mínima entre pickup y dropoff: si el destino muestreado
+            # está muy cerca, se elige uno entre los que cumplen (sin reintentos)
+            if pickup.manhattan_distance(dropoff) < 5:
+                dropoff = coordinator.grid.get_random_intersection_far_from(pickup, 5)
 
             # Solo determinar si es discapacitado o no
             if not is_disabled:
@@ -342,6 +395,10 @@ class CoordinatorAgent(Agent):
             )
 
             coordinator.passengers[passenger_id] = passenger
+            coordinator.waiting_passenger_ids.add(passenger_id)
+            coordinator.unassigned_passenger_ids.add(passenger_id)
+            coordinator.assignment_dirty = True
+            coordinator.version += 1
 
             # Log simplificado
             passenger_type = "DISABLED" if is_disabled else "NORMAL"
@@ -364,12 +421,13 @@ class CoordinatorAgent(Agent):
 def launch_agent_coordinator():
     """Función principal del sistema"""
 
-    print("🚕 Sistema de Taxis con Constraint Programming")
-    print("=" * 50)
-
     try:
-        print("✅ Módulos cargados correctamente")
-        print("🔥 Iniciando sistema...")
+        print(
+            "🚕 Sistema de Taxis con Constraint Programming\n"
+            f"{'=' * 50}\n"
+            "✅ Módulos cargados correctamente\n"
+            "🔥 Iniciando sistema..."
+        )
         # Lanzar la interfaz gráfica
         launch_taxi_gui()
 
@@ -14,21 +14,27 @@ async def cleanup_agent(agent) -> None:
             await agent.stop()
 
         # Remove from Openfire
-        openfire_api.delete_user(agent_id)
+        await asyncio.get_running_loop().run_in_executor(
+            None, openfire_api.delete_user, agent_id
+        )
 
         logger.info(f"Cleaned up agent {agent_id}")
 
     except Exception as e:
         logger.error(f"Error cleaning up agent {getattr(agent, 'agent_id', 'unknown')}: {e}")
 
-async def cleanup_agent_batch(agents) -> None:
+async def cleanup_agent_batch(agents, timeout: float = 5.0) -> None:
     """Clean up a batch of agents"""
 
-    cleanup_tasks = []
-    for agent in agents:
-        cleanup_tasks.append(cleanup_agent(agent))
+    # Per-agent timeout: a stuck agent must not stall the rest of the shutdown
+    cleanup_tasks = [
+        asyncio.wait_for(cleanup_agent(agent), timeout=timeout) for agent in agents
+    ]
 
-    if cleanup_tasks:
-        await asyncio.gather(*cleanup_tasks, return_exceptions=True)
+    for task in asyncio.as_completed(cleanup_tasks):
+        try:
+            await task
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out cleaning up an agent after {timeout}s")
 
-    logger.info(f"Cleaned up {len(agents)} agents")
\ No newline at end of file
+    logger.info(f"Cleaned up {len(agents)} agents")
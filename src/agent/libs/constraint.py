@@ -1,10 +1,22 @@
-from typing import Dict, List
-from ortools.constraint_solver import pywrapcp
+import logging
+from operator import attrgetter
+from typing import Dict, List, Optional
+from ortools.graph.python import linear_sum_assignment
 
 from src.agent.libs.environment import GridPosition, PassengerInfo, PassengerState, TaxiInfo, TaxiState
 from src.config import config
 from src.utils.logger import logger
 
+# Conteo de discapacitados en C (map + attrgetter) sin generador por pasajero
+_is_disabled = attrgetter("is_disabled")
+
+# Distancias máximas a probar progresivamente
+DISTANCES_TO_TRY = (25, 35, 50, 75, 100, 150, 999)
+
+# Gran incentivo (negativo) por cada asignación realizada
+ASSIGNMENT_BONUS = -10000
+
+
 class ConstraintSolver:
     """Solver de constraint programming para asignación óptima"""
 
@@ -59,18 +71,40 @@ class ConstraintSolver:
         """
         
         # Analizar composición de pasajeros
-        disabled_count = sum(1 for p in passengers if self._passenger_is_disabled(p))
+        disabled_count = sum(map(_is_disabled, passengers))
         normal_count = len(passengers) - disabled_count
         
         logger.info(f"👥 Passenger analysis: {disabled_count} disabled, {normal_count} normal")
         
-        # Distancias a probar progresivamente
-        distances_to_try = [25, 35, 50, 75, 100, 150, 999]
+        # Matriz de distancias taxi-pasajero: una sola vez para todos los intentos
+        distances = [
+            [taxi.position.manhattan_distance(p.pickup_position) for p in passengers]
+            for taxi in taxis
+        ]
+        
+        distances_to_try = DISTANCES_TO_TRY
+        
+        # Radio mínimo útil: distancia del par elegible más cercano (taxi con cupo y
+        # pasajero sin asignar). Los radios menores no tienen pares factibles.
+        open_taxis = [
+            i for i, taxi in enumerate(taxis) if taxi.current_passengers < taxi.capacity
+        ]
+        open_passengers = [
+            j for j, p in enumerate(passengers) if p.assigned_taxi_id is None
+        ]
+        if not open_taxis or not open_passengers:
+            logger.info("No eligible taxi-passenger pairs")
+            return {}
+        closest = min(distances[i][j] for i in open_taxis for j in open_passengers)
         
         for attempt, max_distance in enumerate(distances_to_try, 1):
+            if max_distance < closest:
+                logger.debug("Skipping max_distance %s: closest pair is %s", max_distance, closest)
+                continue
+            
             logger.info(f"🔍 Attempt {attempt}/{len(distances_to_try)}: max_distance = {max_distance}")
             
-            assignments = self._solve_with_ortools(taxis, passengers, max_distance)
+            assignments = self._solve_with_ortools(taxis, passengers, max_distance, distances)
             
             if assignments:
                 logger.info(f"✅ SUCCESS with distance {max_distance}: {len(assignments)} assignments")
@@ -81,207 +115,137 @@ class ConstraintSolver:
         return {}
 
     def _solve_with_ortools(
-        self, taxis: List[TaxiInfo], passengers: List[PassengerInfo], max_distance: int
+        self,
+        taxis: List[TaxiInfo],
+        passengers: List[PassengerInfo],
+        max_distance: int,
+        distances: Optional[List[List[int]]] = None,
     ) -> Dict[str, str]:
         """
-        Solver principal usando OR-Tools con función objetivo simplificada
+        Solver principal usando OR-Tools (asignación lineal óptima) con función objetivo simplificada
         """
             
         try:
-            solver = pywrapcp.Solver("TaxiAssignment")
             n_taxis = len(taxis)
             n_passengers = len(passengers)
             
             if n_taxis == 0 or n_passengers == 0:
                 return {}
             
-            # Variables de decisión: assignment[i][j] = 1 si taxi i asignado a pasajero j
-            assignment = {}
-            all_vars = []
-            
-            for i in range(n_taxis):
-                assignment[i] = {}
-                for j in range(n_passengers):
-                    var = solver.IntVar(0, 1, f"assign_{i}_{j}")
-                    assignment[i][j] = var
-                    all_vars.append(var)
-            
-            # RESTRICCIONES DE EXCLUSIVIDAD ESTRICTA
-            
-            # Restricción 1: cada taxi a EXACTAMENTE un pasajero o ninguno (máximo 1)
-            for i in range(n_taxis):
-                taxi_sum = solver.Sum([assignment[i][j] for j in range(n_passengers)])
-                solver.Add(taxi_sum <= 1)
-                logger.debug(f"Constraint: Taxi {i} can be assigned to at most 1 passenger")
-            
-            # Restricción 2: cada pasajero a EXACTAMENTE un taxi o ninguno (máximo 1)
-            for j in range(n_passengers):
-                passenger_sum = solver.Sum([assignment[i][j] for i in range(n_taxis)])
-                solver.Add(passenger_sum <= 1)
-                logger.debug(f"Constraint: Passenger {j} can be assigned to at most 1 taxi")
+            # Matriz de distancias taxi-pasajero (reutilizada entre intentos si se recibe)
+            if distances is None:
+                distances = [
+                    [taxi.position.manhattan_distance(p.pickup_position) for p in passengers]
+                    for taxi in taxis
+                ]
             
-            # Restricción 3: no asignar pasajeros ya asignados a otros taxis
-            for j, passenger in enumerate(passengers):
-                if passenger.assigned_taxi_id:
-                    # Si el pasajero ya tiene un taxi asignado, no permitir nuevas asignaciones
-                    for i in range(n_taxis):
-                        taxi = taxis[i]
-                        if taxi.taxi_id != passenger.assigned_taxi_id:
-                            solver.Add(assignment[i][j] == 0)
-                            logger.debug(f"Blocking assignment: Passenger {passenger.passenger_id} already assigned to {passenger.assigned_taxi_id}")
-            
-            # Restricción 4: distancia y capacidad
+            # RESTRICCIONES + FUNCIÓN OBJETIVO: costo de cada par factible (None si no se permite)
+            costs = []
             feasible_count = 0
-            for i in range(n_taxis):
-                for j in range(n_passengers):
-                    taxi = taxis[i]
-                    passenger = passengers[j]
-                    
-                    distance = taxi.position.manhattan_distance(passenger.pickup_position)
-                    
+            min_cost = 0
+            # Trazas por par: solo se formatean si DEBUG está habilitado
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+            for i, taxi in enumerate(taxis):
+                taxi_full = taxi.current_passengers >= taxi.capacity
+                row = distances[i]
+                cost_row = []
+                for j, passenger in enumerate(passengers):
+                    distance = row[j]
+
                     # Si está muy lejos, taxi lleno, o pasajero ya asignado, no permitir asignación
-                    if (distance > max_distance or 
-                        taxi.current_passengers >= taxi.capacity or
+                    if (distance > max_distance or
+                        taxi_full or
                         passenger.assigned_taxi_id is not None):
-                        solver.Add(assignment[i][j] == 0)
-                    else:
-                        feasible_count += 1
+                        cost_row.append(None)
+                        continue
+
+                    # INCENTIVO DE ASIGNACIÓN: Gran bonus negativo por cada asignación
+                    assignment_bonus = ASSIGNMENT_BONUS
+
+                    # COSTO DE DISTANCIA: Penalizar distancia (pero menos que el bonus de asignación)
+                    distance_cost = distance * self.distance_weight
+
+                    # PRIORIDAD DE DISCAPACIDAD: Bonus adicional para discapacitados
+                    disability_bonus = 0
+                    if self._passenger_is_disabled(passenger):
+                        disability_bonus = -self.disability_priority  # Bonus adicional para discapacitados
+                        if debug_enabled:
+                            logger.debug(
+                                "Disabled passenger %s: applying priority bonus",
+                                passenger.passenger_id,
+                            )
+
+                    # COSTO TOTAL: assignment_bonus (siempre negativo) + distance_cost (positivo) + disability_bonus (negativo para discapacitados)
+                    total_cost = assignment_bonus + distance_cost + disability_bonus
+
+                    if debug_enabled:
+                        logger.debug(
+                            "Cost calculation for taxi %s -> passenger %s: "
+                            "assignment_bonus=%s, distance_cost=%s, "
+                            "disability_bonus=%s, total_cost=%s",
+                            taxi.taxi_id,
+                            passenger.passenger_id,
+                            assignment_bonus,
+                            distance_cost,
+                            disability_bonus,
+                            total_cost,
+                        )
+
+                    # Una asignación que no reduce el costo equivale a no asignar
+                    if total_cost >= 0:
+                        cost_row.append(None)
+                        continue
+
+                    cost_row.append(total_cost)
+                    feasible_count += 1
+                    min_cost = min(min_cost, total_cost)
+                costs.append(cost_row)
             
             if feasible_count == 0:
                 logger.warning(f"No feasible assignments with distance {max_distance}")
                 return {}
             
             logger.info(f"Feasible assignments: {feasible_count}")
-            
-            # FUNCIÓN OBJETIVO: Maximizar asignaciones y minimizar distancia
-            cost_terms = []
-            assignment_incentive_terms = []  # Para incentivar asignaciones
-            
-            for i in range(n_taxis):
-                for j in range(n_passengers):
-                    taxi = taxis[i]
-                    passenger = passengers[j]
-                    distance = taxi.position.manhattan_distance(passenger.pickup_position)
-                    
-                    # Solo agregar costo si la asignación es factible
-                    if (distance <= max_distance and 
-                        taxi.current_passengers < taxi.capacity and
-                        passenger.assigned_taxi_id is None):
-                        
-                        # INCENTIVO DE ASIGNACIÓN: Gran bonus negativo por cada asignación
-                        assignment_bonus = -10000  # Gran incentivo por hacer asignaciones
-                        
-                        # COSTO DE DISTANCIA: Penalizar distancia (pero menos que el bonus de asignación)
-                        distance_cost = distance * self.distance_weight
-                        
-                        # PRIORIDAD DE DISCAPACIDAD: Bonus adicional para discapacitados
-                        disability_bonus = 0
-                        if self._passenger_is_disabled(passenger):
-                            disability_bonus = -self.disability_priority  # Bonus adicional para discapacitados
-                            logger.debug(f"Disabled passenger {passenger.passenger_id}: applying priority bonus")
-                        
-                        # COSTO TOTAL: assignment_bonus (siempre negativo) + distance_cost (positivo) + disability_bonus (negativo para discapacitados)
-                        total_cost = assignment_bonus + distance_cost + disability_bonus
-                        cost_terms.append(assignment[i][j] * total_cost)
-                        
-                        logger.debug(f"Cost calculation for taxi {taxi.taxi_id} -> passenger {passenger.passenger_id}: "
-                                   f"assignment_bonus={assignment_bonus}, distance_cost={distance_cost}, "
-                                   f"disability_bonus={disability_bonus}, total_cost={total_cost}")
-            
-            # Configurar búsqueda con estrategia más simple
-            if cost_terms:
-                objective = solver.Minimize(solver.Sum(cost_terms), 1)
-                # Usar estrategia de búsqueda más determinística
-                db = solver.Phase(
-                    all_vars,
-                    solver.CHOOSE_MIN_SIZE_LOWEST_MIN,  # Estrategia más determinística
-                    solver.ASSIGN_MIN_VALUE,
-                )
-                solver.NewSearch(db, [objective])
-            else:
+
+            # Problema de asignación cuadrado: filas/columnas ficticias y pares no permitidos
+            # cuestan "no asignar" (0). Se desplazan todos los costos para que sean >= 0;
+            # cada nodo izquierdo usa exactamente un arco, así que el óptimo no cambia.
+            size = max(n_taxis, n_passengers)
+            offset = -min_cost
+            solver = linear_sum_assignment.SimpleLinearSumAssignment()
+            for i in range(size):
+                cost_row = costs[i] if i < n_taxis else None
+                for j in range(size):
+                    cost = cost_row[j] if cost_row is not None and j < n_passengers else None
+                    solver.add_arc_with_cost(i, j, (cost or 0) + offset)
+
+            status = solver.solve()
+            if status != solver.OPTIMAL:
+                logger.warning(f"OR-Tools assignment finished with status {status}")
                 return {}
-            
-            # Extraer solución
+
+            # Extraer asignaciones: cada taxi y cada pasajero aparece como máximo una vez
             assignments = {}
-            
-            # Intentar obtener múltiples soluciones si la primera falla
-            solutions_found = 0
-            max_solutions = 3
-            
-            while solver.NextSolution() and solutions_found < max_solutions:
-                solutions_found += 1
-                logger.info(f"✅ OR-Tools solution #{solutions_found} found:")
-                
-                # Extraer asignaciones
-                extracted_count = 0
-                temp_assignments = {}
-                assigned_passengers = set()  # Para verificar exclusividad
-                assigned_taxis = set()  # Para verificar exclusividad
-                
-                for i in range(n_taxis):
-                    for j in range(n_passengers):
-                        try:
-                            var_value = assignment[i][j].Value()
-                            
-                            if var_value == 1:
-                                taxi = taxis[i]
-                                passenger = passengers[j]
-                                
-                                # Verificar exclusividad ESTRICTA
-                                if passenger.passenger_id in assigned_passengers:
-                                    logger.error(f"   This violates the exclusivity constraint!")
-                                    continue
-                                if taxi.taxi_id in assigned_taxis:
-                                    logger.error(f"   This violates the exclusivity constraint!")
-                                    continue
-                                
-                                # Verificar que el pasajero no esté ya asignado a otro taxi
-                                if passenger.assigned_taxi_id and passenger.assigned_taxi_id != taxi.taxi_id:
-                                    continue
-                                
-                                distance = taxi.position.manhattan_distance(passenger.pickup_position)
-                                
-                                # ✅ ASIGNACIÓN VÁLIDA Y EXCLUSIVA
-                                temp_assignments[taxi.taxi_id] = passenger.passenger_id
-                                assigned_passengers.add(passenger.passenger_id)
-                                assigned_taxis.add(taxi.taxi_id)
-                                extracted_count += 1
-                                
-                                passenger_type = "DISABLED" if self._passenger_is_disabled(passenger) else "NORMAL"
-                                priority_flag = "🔥 PRIORITY" if self._passenger_is_disabled(passenger) else ""
-                                
-                                logger.info(
-                                    f"  ✅ EXCLUSIVE ASSIGNMENT: Taxi {taxi.taxi_id} -> Passenger {passenger.passenger_id} [{passenger_type}] "
-                                    f"distance={distance} {priority_flag}"
-                                )
-                        except Exception as e:
-                            logger.error(f"Error extracting variable assign_{i}_{j}: {e}")
-                
-                logger.info(f"Extracted {extracted_count} assignments from solution #{solutions_found}")
-                
-                # Si encontramos asignaciones válidas, validar exclusividad final
-                if extracted_count > 0:
-                    # Validación final de exclusividad
-                    taxis_in_assignments = list(temp_assignments.keys())
-                    passengers_in_assignments = list(temp_assignments.values())
-                    
-                    if len(taxis_in_assignments) != len(set(taxis_in_assignments)):
-                        continue
-                        
-                    if len(passengers_in_assignments) != len(set(passengers_in_assignments)):
-                        continue
-                    
-                    logger.info(f"✅ FINAL VALIDATION PASSED: {extracted_count} exclusive assignments confirmed")
-                    assignments = temp_assignments
-                    break
-                else:
-                    logger.warning(f"Solution #{solutions_found} extracted 0 assignments, trying next...")
-            
-            solver.EndSearch()
+            for i, taxi in enumerate(taxis):
+                j = solver.right_mate(i)
+                if j >= n_passengers or costs[i][j] is None:
+                    continue
+
+                passenger = passengers[j]
+                assignments[taxi.taxi_id] = passenger.passenger_id
+
+                passenger_type = "DISABLED" if self._passenger_is_disabled(passenger) else "NORMAL"
+                priority_flag = "🔥 PRIORITY" if self._passenger_is_disabled(passenger) else ""
+
+                logger.info(
+                    f"  ✅ EXCLUSIVE ASSIGNMENT: Taxi {taxi.taxi_id} -> Passenger {passenger.passenger_id} [{passenger_type}] "
+                    f"distance={distances[i][j]} {priority_flag}"
+                )
+
+            logger.info(f"✅ OR-Tools optimal assignment: {len(assignments)} exclusive assignments")
             return assignments
             
         except Exception as e:
             logger.error(f"OR-Tools solver error: {e}")
             return {}
-
-
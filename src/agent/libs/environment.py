@@ -1,7 +1,7 @@
 import logging
 import random
 from dataclasses import dataclass
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from enum import Enum
 
 # Configure logging
@@ -25,6 +25,9 @@ class PassengerState(Enum):
 @dataclass
 class GridPosition:
     """Posición en la grilla"""
+    # Sin __dict__ por instancia (compatible con Python 3.8, sin dataclass(slots=True))
+    __slots__ = ("x", "y")
+
     x: int
     y: int
     
@@ -74,10 +77,28 @@ class GridNetwork:
     def __init__(self, width: int = 20, height: int = 20):
         self.width = width
         self.height = height
-        self.intersections: Set[GridPosition] = set()
+        # Generador propio: no comparte estado ni bloqueo con el módulo random global
+        self._rng = random.Random()
+        self.intersections = set()
         self._generate_intersections()
         
         logger.info(f"Grid network created: {width}x{height} with {len(self.intersections)} intersections")
+
+    @property
+    def intersections(self) -> Set[GridPosition]:
+        return self._intersections
+
+    @intersections.setter
+    def intersections(self, positions: Set[GridPosition]):
+        self._intersections = positions
+        # Lista precalculada para el muestreo aleatorio (evita list(set) en cada llamada)
+        self._intersection_list: List[GridPosition] = list(positions)
+        # Posiciones compartidas por coordenada: las rutas no crean objetos nuevos
+        self._positions: Dict[Tuple[int, int], GridPosition] = {
+            (pos.x, pos.y): pos for pos in positions
+        }
+        # Destinos válidos por (x, y, distancia mínima): se calculan una vez por origen
+        self._far_candidates: Dict[Tuple[int, int, int], List[GridPosition]] = {}
     
     def load_from_dict(self, data: dict):
         self.width = data.get("width", 20)
@@ -86,13 +107,33 @@ class GridNetwork:
         
     def _generate_intersections(self):
         """Genera todas las intersecciones de la grilla"""
-        for x in range(self.width):
-            for y in range(self.height):
-                self.intersections.add(GridPosition(x, y))
+        self.intersections = {
+            GridPosition(x, y) for x in range(self.width) for y in range(self.height)
+        }
     
     def get_random_intersection(self) -> GridPosition:
         """Obtiene una intersección aleatoria"""
-        return random.choice(list(self.intersections))
+        return self._rng.choice(self._intersection_list)
+
+    def get_random_intersections(self, k: int) -> List[GridPosition]:
+        """Obtiene k intersecciones aleatorias (con reemplazo) en una sola llamada"""
+        return self._rng.choices(self._intersection_list, k=k)
+    
+    def get_random_intersection_far_from(
+        self, origin: GridPosition, min_distance: int
+    ) -> GridPosition:
+        """Obtiene una intersección aleatoria a distancia Manhattan >= min_distance"""
+        key = (origin.x, origin.y, min_distance)
+        candidates = self._far_candidates.get(key)
+        if candidates is None:
+            candidates = self._far_candidates[key] = [
+                pos
+                for pos in self._intersection_list
+                if pos.manhattan_distance(origin) >= min_distance
+            ]
+        if not candidates:
+            return self.get_random_intersection()
+        return self._rng.choice(candidates)
     
     def get_adjacent_positions(self, pos: GridPosition) -> List[GridPosition]:
         """Obtiene posiciones adyacentes válidas (solo horizontal/vertical)"""
@@ -114,25 +155,18 @@ class GridNetwork:
         """Calcula ruta usando pathfinding Manhattan simple"""
         if start == end:
             return [start]
-        
-        path = [start]
-        current = GridPosition(start.x, start.y)
-        
+
+        positions = self._positions
+        step_x = 1 if end.x >= start.x else -1
+        step_y = 1 if end.y >= start.y else -1
+
         # Simple pathfinding: moverse primero horizontalmente, luego verticalmente
-        while current.x != end.x:
-            if current.x < end.x:
-                current.x += 1
-            else:
-                current.x -= 1
-            path.append(GridPosition(current.x, current.y))
-        
-        while current.y != end.y:
-            if current.y < end.y:
-                current.y += 1
-            else:
-                current.y -= 1
-            path.append(GridPosition(current.x, current.y))
-        
+        path = [start]
+        for x in range(start.x + step_x, end.x + step_x, step_x):
+            path.append(positions.get((x, start.y)) or GridPosition(x, start.y))
+        for y in range(start.y + step_y, end.y + step_y, step_y):
+            path.append(positions.get((end.x, y)) or GridPosition(end.x, y))
+
         return path
     
     def to_dict(self) -> dict:
@@ -1,5 +1,5 @@
-from enum import Enum
 import json
+import logging
 import time
 from typing import Dict, List, Optional
 import uuid
@@ -14,6 +14,7 @@ from src.config import config
 from src.services.openfire_api import openfire_api
 
 COORDINATOR_JID = f"coordinator@{config.openfire_container}"
+GRID_INFO_REQUEST_BODY = json.dumps({"request": "grid_info"})
 
 
 # ==================== TAXI AGENT ====================
@@ -36,25 +37,37 @@ class TaxiAgent(Agent):
         self.dropoff_position: Optional[GridPosition] = (
             None  # Para guardar destino del pasajero
         )
+        self._taxi_info_request_body = json.dumps({"taxi_id": taxi_id})
+        # Plantilla del reporte de estado: solo se actualizan los campos variables
+        self._status_payload: Dict = {
+            "taxi_id": taxi_id,
+            "position": {"x": 0, "y": 0},
+            "target_position": None,
+            "state": TaxiState.IDLE.value,
+            "capacity": 0,
+            "current_passengers": 0,
+            "assigned_passenger_id": None,
+            "speed": 1.0,
+        }
 
         logger.info(f"Taxi agent {taxi_id} created")
 
-    def _to_serializable_dict(self, obj):
-        """Convierte un dataclass a dict serializable por JSON, convirtiendo enums a string."""
-
-        if hasattr(obj, "__dataclass_fields__"):
-            result = {}
-            for k, v in obj.__dict__.items():
-                result[k] = self._to_serializable_dict(v)
-            return result
-        elif isinstance(obj, Enum):
-            return obj.value  # Usar .value en lugar de .name para consistencia
-        elif isinstance(obj, list):
-            return [self._to_serializable_dict(i) for i in obj]
-        elif isinstance(obj, dict):
-            return {k: self._to_serializable_dict(v) for k, v in obj.items()}
-        else:
-            return obj
+    def _status_body(self) -> str:
+        """Serializa el estado actual reutilizando la plantilla del reporte"""
+
+        info = self.info
+        payload = self._status_payload
+        position = payload["position"]
+        position["x"] = info.position.x
+        position["y"] = info.position.y
+        target = info.target_position
+        payload["target_position"] = {"x": target.x, "y": target.y} if target else None
+        payload["state"] = info.state.value
+        payload["capacity"] = info.capacity
+        payload["current_passengers"] = info.current_passengers
+        payload["assigned_passenger_id"] = info.assigned_passenger_id
+        payload["speed"] = info.speed
+        return json.dumps(payload)
 
     async def setup(self):
         """Configuración inicial del agente"""
@@ -84,37 +97,47 @@ class TaxiAgent(Agent):
             try:
                 agent: "TaxiAgent" = self.agent  # type: ignore
                 if not agent.info:
-                    logger.info(
-                        f"Taxi {agent.taxi_id} movement check - info not initialized"
+                    logger.debug(
+                        "Taxi %s movement check - info not initialized", agent.taxi_id
                     )
                     return
 
                 if not agent.grid:
-                    logger.info(
-                        f"Taxi {agent.taxi_id} movement check - grid not initialized"
+                    logger.debug(
+                        "Taxi %s movement check - grid not initialized", agent.taxi_id
                     )
                     return
 
-                logger.info(
-                    f"Taxi {agent.taxi_id} movement check - State: {agent.info.state.value}, Position: ({agent.info.position.x}, {agent.info.position.y}), Target: {agent.info.target_position}"
-                )
+                # Trazas por tick: solo se formatean si DEBUG está habilitado
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Taxi %s movement check - State: %s, Position: (%s, %s), Target: %s",
+                        agent.taxi_id,
+                        agent.info.state.value,
+                        agent.info.position.x,
+                        agent.info.position.y,
+                        agent.info.target_position,
+                    )
 
                 if agent.info.state == TaxiState.IDLE:
                     # Movimiento aleatorio de patrullaje
-                    logger.info(f"Taxi {agent.taxi_id} patrolling...")
+                    logger.debug("Taxi %s patrolling...", agent.taxi_id)
                     self._patrol_movement()
                 elif agent.info.state in [TaxiState.PICKUP, TaxiState.DROPOFF]:
                     # Movimiento hacia objetivo
-                    logger.info(
-                        f"🚕 Taxi {agent.taxi_id} MOVING towards target: {agent.info.target_position}"
+                    logger.debug(
+                        "🚕 Taxi %s MOVING towards target: %s",
+                        agent.taxi_id,
+                        agent.info.target_position,
                     )
                     arrived = self._move_towards_target()
                     if arrived:
                         logger.info(f"🎯 Taxi {agent.taxi_id} ARRIVED at target!")
                         await self._handle_arrival()
                 elif agent.info.state == TaxiState.ASSIGNED:
-                    logger.info(
-                        f"Taxi {agent.taxi_id} is assigned but not yet moving - checking state"
+                    logger.debug(
+                        "Taxi %s is assigned but not yet moving - checking state",
+                        agent.taxi_id,
                     )
                 else:
                     logger.warning(
@@ -199,13 +222,21 @@ class TaxiAgent(Agent):
                 )
                 return
 
-            logger.info(
-                f"Taxi {agent.taxi_id} patrolling - current position: ({agent.info.position.x}, {agent.info.position.y}), path index: {agent.path_index}, len path: {len(agent.path)}"
+            logger.debug(
+                "Taxi %s patrolling - current position: (%s, %s), path index: %s, len path: %s",
+                agent.taxi_id,
+                agent.info.position.x,
+                agent.info.position.y,
+                agent.path_index,
+                len(agent.path),
             )
 
             if not agent.path or agent.path_index >= len(agent.path):
-                logger.info(
-                    f"Taxi {agent.taxi_id} {agent.path} {agent.path_index} - recalculating patrol path"
+                logger.debug(
+                    "Taxi %s %s %s - recalculating patrol path",
+                    agent.taxi_id,
+                    agent.path,
+                    agent.path_index,
                 )
                 # Elegir nuevo destino aleatorio
                 target = agent.grid.get_random_intersection()
@@ -214,8 +245,10 @@ class TaxiAgent(Agent):
 
             # Mover al siguiente punto en el path
             if agent.path_index < len(agent.path):
-                logger.info(
-                    f"Taxi {agent.taxi_id} patrolling to next position: {agent.path[agent.path_index]}"
+                logger.debug(
+                    "Taxi %s patrolling to next position: %s",
+                    agent.taxi_id,
+                    agent.path[agent.path_index],
                 )
                 agent.info.position = agent.path[agent.path_index]
                 agent.path_index += 1
@@ -239,8 +272,13 @@ class TaxiAgent(Agent):
             current_pos = agent.info.position
             target_pos = agent.info.target_position
 
-            logger.info(
-                f"🚕 Taxi {agent.taxi_id} current pos: ({current_pos.x}, {current_pos.y}), target: ({target_pos.x}, {target_pos.y})"
+            logger.debug(
+                "🚕 Taxi %s current pos: (%s, %s), target: (%s, %s)",
+                agent.taxi_id,
+                current_pos.x,
+                current_pos.y,
+                target_pos.x,
+                target_pos.y,
             )
 
             # Verificar si ya estamos en el target
@@ -254,13 +292,20 @@ class TaxiAgent(Agent):
             if not agent.path or agent.path_index >= len(agent.path):
                 # Calcular nuevo path hacia el objetivo
                 try:
-                    logger.info(
-                        f"🗺️ Taxi {agent.taxi_id} calculating new path from ({current_pos.x}, {current_pos.y}) to ({target_pos.x}, {target_pos.y})"
+                    logger.debug(
+                        "🗺️ Taxi %s calculating new path from (%s, %s) to (%s, %s)",
+                        agent.taxi_id,
+                        current_pos.x,
+                        current_pos.y,
+                        target_pos.x,
+                        target_pos.y,
                     )
                     agent.path = agent.grid.get_path(current_pos, target_pos)
                     agent.path_index = 0
-                    logger.info(
-                        f"✅ Taxi {agent.taxi_id} calculated path with {len(agent.path)} steps"
+                    logger.debug(
+                        "✅ Taxi %s calculated path with %s steps",
+                        agent.taxi_id,
+                        len(agent.path),
                     )
 
                     if len(agent.path) == 0:
@@ -288,8 +333,15 @@ class TaxiAgent(Agent):
                 old_pos = agent.info.position
                 agent.info.position = new_pos
 
-                logger.info(
-                    f"🚶 Taxi {agent.taxi_id} moved from ({old_pos.x}, {old_pos.y}) to ({new_pos.x}, {new_pos.y}) (step {agent.path_index}/{len(agent.path)-1})"
+                logger.debug(
+                    "🚶 Taxi %s moved from (%s, %s) to (%s, %s) (step %s/%s)",
+                    agent.taxi_id,
+                    old_pos.x,
+                    old_pos.y,
+                    new_pos.x,
+                    new_pos.y,
+                    agent.path_index,
+                    len(agent.path) - 1,
                 )
 
                 # Verificar si llegamos al objetivo
@@ -321,25 +373,39 @@ class TaxiAgent(Agent):
     class CommunicationBehaviour(CyclicBehaviour):
         """Maneja comunicación XMPP"""
 
-        async def run(self):
-            # Get info of the grid from the coordinator
+        async def on_start(self):
+            # Definido antes del primer envío: run() lo consulta aunque el envío falle
+            self._last_init_request = time.time()
+            # Pedir grilla e info al coordinador una sola vez; se reintenta solo sin respuesta
+            await self._request_init_info()
+
+        async def _request_init_info(self):
+            """Solicita al coordinador la información que aún falta"""
+
             agent: "TaxiAgent" = self.agent  # type: ignore
+            self._last_init_request = time.time()
+
             if not agent.grid:
-                #logger.info(f"Sending request for grid info { COORDINATOR_JID}")
                 msg = Message(to=COORDINATOR_JID)
                 msg.set_metadata("performative", "request") # FIPA
                 msg.set_metadata("type", "get_grid_info")
-                msg.body = json.dumps({"request": "grid_info"})
+                msg.body = GRID_INFO_REQUEST_BODY
                 await self.send(msg)
 
             if not agent.info:
-                #logger.info(f"Sending request for taxi info { COORDINATOR_JID}")
                 msg = Message(to=COORDINATOR_JID)
                 msg.set_metadata("performative", "request") # FIPA
                 msg.set_metadata("type", "get_taxi_info")
-                msg.body = json.dumps({"taxi_id": agent.taxi_id})
+                msg.body = agent._taxi_info_request_body
                 await self.send(msg)
 
+        async def run(self):
+            agent: "TaxiAgent" = self.agent  # type: ignore
+            if (not agent.grid or not agent.info) and (
+                time.time() - self._last_init_request >= config.init_request_retry
+            ):
+                await self._request_init_info()
+
             # Handle messages
             msg = await self.receive(timeout=1)
             if msg:
@@ -355,7 +421,7 @@ class TaxiAgent(Agent):
 
             try:
                 msg_type = msg.get_metadata("type")
-                logger.info(f"Taxi {agent.taxi_id} received message type: {msg_type}")
+                logger.debug("Taxi %s received message type: %s", agent.taxi_id, msg_type)
 
                 if msg_type == "assignment":
                     if not agent.info:
@@ -532,38 +598,51 @@ class TaxiAgent(Agent):
     class StatusReportBehaviour(PeriodicBehaviour):
         """Reporta estado al coordinador"""
 
+        async def on_start(self):
+            # Metadatos fijos; el mensaje es nuevo en cada envío porque el registro
+            # de mensajes de SPADE guarda una referencia a cada uno
+            self._metadata = {"performative": "inform", "type": "status_report"}
+
         async def run(self):
             agent: "TaxiAgent" = self.agent  # type: ignore
             if agent.info and agent.grid:
-                msg = Message(to=COORDINATOR_JID)
-                msg.set_metadata("performative", "inform")
-                msg.set_metadata("type", "status_report")
-                # Usar función serializadora para enums
-                serializable_info = agent._to_serializable_dict(agent.info)
-                msg.body = json.dumps(serializable_info)
+                msg = Message(
+                    to=COORDINATOR_JID,
+                    body=agent._status_body(),
+                    metadata=self._metadata,
+                )
                 await self.send(msg)
 
 
-async def create_agent_taxi(agent_id: str):
+def taxi_password(agent_id: str) -> str:
+    """Contraseña XMPP de un agente taxi"""
+    return f"agent_taxi_{agent_id}_pass"
+
+
+async def create_agent_taxi(agent_id: str, register_user: bool = True):
     """Create and initialize an ideological agent"""
 
     try:
-        # Create user in Openfire if not exists
-        password = f"agent_taxi_{agent_id}_pass"
+        password = taxi_password(agent_id)
         jid = f"{agent_id}@{config.openfire_domain}"
 
-        if not openfire_api.create_user(agent_id, password):
-            logger.error(f"Failed to create Openfire user for agent {agent_id}")
-            return None
+        # Create user in Openfire if not exists (skipped when created in bulk)
+        if register_user:
+            # La llamada REST es bloqueante: ejecutarla fuera del event loop
+            loop = asyncio.get_running_loop()
+            created = await loop.run_in_executor(
+                None, openfire_api.create_user, agent_id, password
+            )
+            if not created:
+                logger.error(f"Failed to create Openfire user for agent {agent_id}")
+                return None
 
         # Create and start the agent
         agent = TaxiAgent(jid, password, agent_id)
 
-        # Start the agent
+        # Start the agent (start() retorna con el agente ya conectado)
         await agent.start(auto_register=True)
 
-        await asyncio.sleep(0.5)
-
         if agent.is_alive():
             logger.info(f"Successfully created agent {agent_id}")
             return agent
@@ -583,22 +662,44 @@ async def launch_agent_taxi(n_agents: int):
 
     logger.info(f"Spawning {n_agents} agents for host {config.openfire_host}")
 
-    agents = []
+    # Un sufijo por oleada de creación: el índice ya distingue a los agentes
+    wave_id = uuid.uuid4().hex[:8]
+    agent_ids = [
+        f"{config.host_name}_agent_taxi_{i}_{wave_id}" for i in range(n_agents)
+    ]
+
+    # Registrar todos los usuarios en Openfire en un solo lote
+    users_created = await asyncio.get_running_loop().run_in_executor(
+        None,
+        openfire_api.create_users,
+        [(agent_id, taxi_password(agent_id)) for agent_id in agent_ids],
+        config.spawn_concurrency,
+    )
+
+    # Limitar los handshakes XMPP simultáneos contra Openfire
+    semaphore = asyncio.Semaphore(config.spawn_concurrency)
+
+    async def spawn(agent_id: str):
+        if not users_created.get(agent_id):
+            logger.error(f"Failed to create Openfire user for agent {agent_id}")
+            return None
+        async with semaphore:
+            return await create_agent_taxi(agent_id, register_user=False)
 
     # Create agents
-    agent_count = 0
-    for i in range(n_agents):
-        agent_id = f"{config.host_name}_agent_taxi_{i}_{uuid.uuid4().hex[:8]}"
-
-        agent = await create_agent_taxi(agent_id)
-        if agent:
-            agents.append(agent)
-            agent_count += 1
-
-        # Small delay between creations
-        await asyncio.sleep(0.2)
-
-    logger.info(f"Spawned {n_agents} agents successfully")
-    while True:
-        await asyncio.sleep(0.5)
-    # return n_agents
+    results = await asyncio.gather(
+        *(spawn(agent_id) for agent_id in agent_ids), return_exceptions=True
+    )
+    agents = [agent for agent in results if isinstance(agent, TaxiAgent)]
+
+    logger.info(f"Spawned {len(agents)}/{n_agents} agents successfully")
+    try:
+        while True:
+            await asyncio.sleep(0.5)
+    finally:
+        # Detener todos los agentes a la vez: el apagado dura lo que el más lento.
+        # Los usuarios de Openfire se conservan (se reutilizan; --fresh o cleanup los borran)
+        await asyncio.gather(
+            *(asyncio.wait_for(agent.stop(), timeout=5) for agent in agents),
+            return_exceptions=True,
+        )
@@ -1,5 +1,12 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+def available_cpus() -> int:
+    """CPUs utilizables por este proceso (respeta la afinidad en Linux)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Windows / macOS
+        return os.cpu_count() or 1
 
 @dataclass 
 class TaxiSystemConfig:
@@ -25,13 +32,17 @@ class TaxiSystemConfig:
     num_taxis: int = 3
     initial_passengers: int = 4
     taxi_capacity: int = 4
+    # Agentes iniciados en paralelo por host
+    spawn_concurrency: int = field(default_factory=lambda: max(4, 2 * available_cpus()))
     
     # Timing
     assignment_interval: float = 2.0  # seconds
     taxi_speed: float = 1.0  # cells per update
     passenger_spawn_rate: float = 0.1  # probability per update
+    passenger_wave_interval: float = 15.0  # seconds
     status_report_interval: float = 1.0  # seconds
     movement_update_interval: float = 1.0  # seconds
+    init_request_retry: float = 5.0  # seconds
     
     # Constraints
     max_pickup_distance: int = 15
@@ -1,8 +1,16 @@
+import asyncio
+import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from src.utils.logger import logger
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from src.config import config
 
+# Los usuarios taxi se nombran "<host>_agent_taxi_<n>_<id>"
+TAXI_USER_MARKER = "taxi_"
+
 class OpenfireAPI:
     """REST API client for Openfire XMPP server"""
 
@@ -15,7 +23,26 @@ class OpenfireAPI:
             "Accept": "application/json",
             "Authorization": "kbouvs6HP4UcMiQs",
         }
-        
+
+        # Sesión persistente: reutiliza conexiones (keep-alive) entre peticiones
+        self.pool_size = 32
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        self.session.mount(
+            "http://",
+            HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.pool_size, max_retries=retries
+            ),
+        )
+
+        # Partes constantes de las peticiones de alta de usuarios
+        self._users_url = f"{self.base_url}/users"
+        self._email_suffix = f"@{config.openfire_domain}"
+
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
 
     def create_user(
         self,
@@ -23,24 +50,26 @@ class OpenfireAPI:
         password: str,
         name: Optional[str] = None,
         email: Optional[str] = None,
+        verbose: bool = True,
     ) -> bool:
         """Create a new user in Openfire"""
-        url = f"{self.base_url}/users"
-
         user_data = {
             "username": username,
             "password": password,
             "name": name or username,
-            "email": email or f"{username}@{config.openfire_domain}",
+            "email": email or username + self._email_suffix,
         }
 
         try:
-            response = requests.post(url, json=user_data, headers=self.headers)
+            # Content-Type ya está en la sesión: se envía el JSON ya codificado
+            response = self.session.post(self._users_url, data=json.dumps(user_data))
             if response.status_code == 201:
-                logger.info(f"User {username} created successfully")
+                if verbose:
+                    logger.info(f"User {username} created successfully")
                 return True
             elif response.status_code == 409:
-                logger.info(f"User {username} already exists")
+                if verbose:
+                    logger.info(f"User {username} already exists")
                 return True
             else:
                 logger.error(
@@ -51,12 +80,31 @@ class OpenfireAPI:
             logger.error(f"Exception creating user {username}: {e}")
             return False
 
+    def create_users(
+        self, users: List[Tuple[str, str]], max_workers: int = 32
+    ) -> Dict[str, bool]:
+        """Create several users concurrently; returns {username: success}"""
+        if not users:
+            return {}
+
+        workers = min(max_workers, self.pool_size, len(users))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda user: self.create_user(*user, verbose=False), users
+            )
+            created = {username: ok for (username, _), ok in zip(users, results)}
+
+        # Un solo resumen por lote; los fallos ya se registran individualmente
+        failed = sum(1 for ok in created.values() if not ok)
+        logger.info(f"Created {len(created) - failed}/{len(created)} users")
+        return created
+
     def delete_user(self, username: str) -> bool:
         """Delete a user from Openfire"""
         url = f"{self.base_url}/users/{username}"
 
         try:
-            response = requests.delete(url, headers=self.headers)
+            response = self.session.delete(url)
             if response.status_code == 200:
                 logger.info(f"User {username} deleted successfully")
                 return True
@@ -69,12 +117,44 @@ class OpenfireAPI:
             logger.error(f"Exception deleting user {username}: {e}")
             return False
 
+    async def delete_users(
+        self, usernames: List[str], concurrency: int = 32
+    ) -> Dict[str, bool]:
+        """Delete several users concurrently; returns {username: success}"""
+        # Dependencia opcional: solo el borrado masivo la necesita
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+
+        async with aiohttp.ClientSession(
+            headers=self.headers, connector=connector
+        ) as session:
+
+            async def delete(username: str) -> bool:
+                url = f"{self.base_url}/users/{username}"
+                try:
+                    async with session.delete(url) as response:
+                        if response.status == 200:
+                            logger.info(f"User {username} deleted successfully")
+                            return True
+                        logger.error(
+                            f"Failed to delete user {username}: {response.status}"
+                        )
+                        return False
+                except Exception as e:
+                    logger.error(f"Exception deleting user {username}: {e}")
+                    return False
+
+            results = await asyncio.gather(*(delete(u) for u in usernames))
+
+        return dict(zip(usernames, results))
+
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user information"""
         url = f"{self.base_url}/users/{username}"
 
         try:
-            response = requests.get(url)
+            response = self.session.get(url)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -89,7 +169,7 @@ class OpenfireAPI:
         url = f"{self.base_url}/users"
 
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             if response.status_code == 200:
                 data = response.json()
                 return [user.get("username") for user in data.get("user", [])]
@@ -100,22 +180,19 @@ class OpenfireAPI:
             logger.error(f"Exception listing users: {e}")
             return []
         
-    def get_taxis_jid(self)-> List[str]:
-        online_users = self.get_online_users()
-
+    def get_taxis_jid(self) -> List[str]:
         """Get list of taxis JIDs"""
-        taxis_jid = []
-        for user in online_users:
-            if user.__contains__("taxi_"):
-                taxis_jid.append(f"{user}@{config.openfire_container}")        
-        return taxis_jid
+        suffix = f"@{config.openfire_container}"
+        return [
+            user + suffix for user in self.get_online_users() if TAXI_USER_MARKER in user
+        ]
 
     def get_online_users(self) -> List[str]:
         """Get list of currently online users"""
         url = f"{self.base_url}/sessions"
 
         try:
-            response = requests.get(url)
+            response = self.session.get(url)
             if response.status_code == 200:
                 data = response.json()
                 sessions = data.get("sessions", [])
@@ -138,7 +215,7 @@ class OpenfireAPI:
         message_data = {"body": message}
 
         try:
-            response = requests.post(url, json=message_data, headers=self.headers)
+            response = self.session.post(url, json=message_data)
             if response.status_code == 200:
                 logger.info("Broadcast message sent successfully")
                 return True
@@ -156,7 +233,7 @@ class OpenfireAPI:
         url = f"{self.base_url}/system/properties"
         print(url)
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Openfire health check failed: {e}")
@@ -3,8 +3,9 @@ from dataclasses import dataclass
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-import time
 import asyncio
+import http.client
+from typing import Dict, List, Optional, Tuple
 
 from src.utils.logger import logger
 from src.config import config
@@ -24,6 +25,28 @@ class TaxiPos():
     taxi_id: str
     position: GridPosition
 
+def _get_attr(obj, attr):
+    """Lee un atributo de un objeto o una clave de un dict"""
+    if isinstance(obj, dict):
+        return obj[attr]
+    return getattr(obj, attr)
+
+
+# (relleno, borde) por estado del taxi; cualquier estado no libre es "ocupado"
+TAXI_COLORS = {
+    TaxiState.IDLE: ("gold", "orange"),
+    "IDLE": ("gold", "orange"),  # taxis recibidos como dict
+}
+BUSY_TAXI_COLORS = ("orange", "darkorange")
+
+# (relleno, borde, símbolo, color de texto) según si el pasajero es discapacitado
+PASSENGER_STYLES = {
+    # Pasajero discapacitado: círculo púrpura con símbolo de silla de ruedas
+    True: ("purple", "darkviolet", "♿", "darkviolet"),
+    # Pasajero normal: cuadrado azul
+    False: ("blue", "darkblue", "👤", "darkblue"),
+}
+
 # ==================== GUI Y SISTEMA PRINCIPAL ====================
 class GridTaxiGUI:
     """Interfaz gráfica principal del sistema de taxis"""
@@ -32,6 +55,29 @@ class GridTaxiGUI:
         self.grid = GridNetwork(config.grid_width, config.grid_height)
         self.coordinator = None
         self.running = False
+        self.system_thread = None
+        self._system_loop = None
+        self._stop_event = None
+        # Pedido de parada del hilo del sistema: existe antes de que arranque su loop
+        self._stop_requested = None
+        self._reset_pending = False
+
+        # Ítems del canvas por pasajero: se crean al aparecer y se borran al ser recogidos
+        self._passenger_items: Dict[str, List[int]] = {}
+        # Ítems por taxi (cuerpo, etiqueta, línea al objetivo): se mueven con coords/itemconfig
+        self._taxi_items: Dict[str, Tuple[int, int, int]] = {}
+        self._drawn_coordinator = None
+        # Redibujado bajo demanda: solo si el coordinador cambió desde el último frame
+        self._drawn_version = None
+        # Centro en píxeles de cada columna/fila: indexar en lugar de multiplicar por frame
+        cell_size = config.grid_cell_size
+        self._cell_center_x = tuple(
+            i * cell_size + cell_size // 2 for i in range(self.grid.width)
+        )
+        self._cell_center_y = tuple(
+            i * cell_size + cell_size // 2 for i in range(self.grid.height)
+        )
+        self._frame_ms = max(1, int(1000 / config.fps))
 
         # GUI setup
         self.root = tk.Tk()
@@ -44,12 +90,15 @@ class GridTaxiGUI:
         self.taxi_count = tk.StringVar(value="0")
         self.passenger_count = tk.StringVar(value="0")
         self.waiting_passengers = tk.StringVar(value="0")
+        # Último valor mostrado de cada estadística (evita .set sin cambios)
+        self._shown_stats: Tuple[str, str, str, str] = ("0", "0", "0", "OR-Tools")
 
         self._setup_gui()
-        self._start_update_thread()
+        # Refresco visual: temporizador de Tk en el hilo principal, sin hilo auxiliar
+        self._render_tick()
         
-        # Actualizar estadísticas iniciales
-        self._update_stats()
+        # Estadísticas: temporizador de Tk en el hilo principal (incluye la actualización inicial)
+        self._stats_tick()
 
         logger.info("GUI initialized")
 
@@ -205,215 +254,237 @@ class GridTaxiGUI:
         self._update_clock()
 
     def _draw_grid(self):
-        """Dibuja la grilla de intersecciones"""
+        """Dibuja la grilla de intersecciones como una sola imagen de fondo"""
         self.canvas.delete("grid")
 
         cell_size = config.grid_cell_size
+        width = self.grid.width * cell_size
+        height = self.grid.height * cell_size
+
+        # Rasterizar la grilla una vez: un único ítem en el canvas en lugar de cientos
+        image = tk.PhotoImage(width=width + 1, height=height + 1)
+        image.put("white", to=(0, 0, width + 1, height + 1))
 
-        # Dibujar líneas de grilla
+        # Líneas de grilla
         for x in range(self.grid.width + 1):
             x_pos = x * cell_size
-            self.canvas.create_line(
-                x_pos,
-                0,
-                x_pos,
-                self.grid.height * cell_size,
-                fill="lightgray",
-                width=1,
-                tags="grid",
-            )
+            image.put("lightgray", to=(x_pos, 0, x_pos + 1, height + 1))
 
         for y in range(self.grid.height + 1):
             y_pos = y * cell_size
-            self.canvas.create_line(
-                0,
-                y_pos,
-                self.grid.width * cell_size,
-                y_pos,
-                fill="lightgray",
-                width=1,
-                tags="grid",
-            )
+            image.put("lightgray", to=(0, y_pos, width + 1, y_pos + 1))
 
-        # Dibujar intersecciones
+        # Intersecciones (cruz pequeña en el centro de cada celda)
+        arm = max(2, cell_size // 8)
         for intersection in self.grid.intersections:
             x = intersection.x * cell_size + cell_size // 2
             y = intersection.y * cell_size + cell_size // 2
-            self.canvas.create_text(
-                x, y, text="╋", font=("Arial", 8), fill="gray", tags="grid"
-            )
+            image.put("gray", to=(x - arm, y, x + arm + 1, y + 1))
+            image.put("gray", to=(x, y - arm, x + 1, y + arm + 1))
+
+        # Mantener la referencia: Tk no conserva la imagen por sí solo
+        self._grid_bg = image
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=image, tags="grid")
+        self.canvas.tag_lower("grid")
+
+    def _cell_center(self, pos) -> Optional[Tuple[int, int]]:
+        """Centro en píxeles de una posición, o None si está fuera de la grilla"""
+        x, y = _get_attr(pos, "x"), _get_attr(pos, "y")
+        if 0 <= x < len(self._cell_center_x) and 0 <= y < len(self._cell_center_y):
+            return self._cell_center_x[x], self._cell_center_y[y]
+        return None
 
     def _draw_entities(self):
         """Dibuja taxis y pasajeros"""
-        self.canvas.delete("entities")
-
         if not self.coordinator:
             return
 
-        cell_size = config.grid_cell_size
-
-        # Dibujar pasajeros
-        for passenger in self.coordinator.passengers.values():
-            if passenger.state == PassengerState.WAITING:
-                x = passenger.pickup_position.x * cell_size + cell_size // 2
-                y = passenger.pickup_position.y * cell_size + cell_size // 2
-
-                # Determinar color y forma según tipo de pasajero
-                if passenger.is_disabled:
-                    # Pasajero discapacitado: círculo púrpura con símbolo de silla de ruedas
-                    passenger_color = "purple"
-                    passenger_outline = "darkviolet"
-                    passenger_symbol = "♿"
-                    passenger_text_color = "darkviolet"
-                else:
-                    # Pasajero normal: cuadrado azul
-                    passenger_color = "blue"
-                    passenger_outline = "darkblue"
-                    passenger_symbol = "👤"
-                    passenger_text_color = "darkblue"
-
-                # Dibujar pasajero con forma apropiada
-                if passenger.is_disabled:
-                    # Círculo para discapacitados
-                    self.canvas.create_oval(
-                        x - 8,
-                        y - 8,
-                        x + 8,
-                        y + 8,
-                        fill=passenger_color,
-                        outline=passenger_outline,
-                        width=3,
-                        tags="entities",
-                    )
-                    # Símbolo de silla de ruedas
-                    self.canvas.create_text(
-                        x,
-                        y,
-                        text=passenger_symbol,
-                        font=("Arial", 10, "bold"),
-                        fill="white",
-                        tags="entities",
-                    )
-                else:
-                    # Cuadrado para normales
-                    self.canvas.create_rectangle(
-                        x - 6,
-                        y - 6,
-                        x + 6,
-                        y + 6,
-                        fill=passenger_color,
-                        outline=passenger_outline,
-                        width=2,
-                        tags="entities",
-                    )
-
-                # Línea punteada al destino
-                dest_x = passenger.dropoff_position.x * cell_size + cell_size // 2
-                dest_y = passenger.dropoff_position.y * cell_size + cell_size // 2
-                line_color = passenger_outline
-                self.canvas.create_line(
-                    x,
-                    y,
-                    dest_x,
-                    dest_y,
-                    fill=line_color,
-                    width=2 if passenger.is_disabled else 1,
-                    dash=(3, 3),
-                    tags="entities",
-                )
-
-                # Destino
-                self.canvas.create_polygon(
-                    dest_x,
-                    dest_y - 6,
-                    dest_x - 5,
-                    dest_y + 4,
-                    dest_x + 5,
-                    dest_y + 4,
-                    fill="red",
-                    outline="darkred",
-                    width=2,
-                    tags="entities",
-                )
-
-                # ID del pasajero con tipo
-                passenger_type = "D" if passenger.is_disabled else "N"
-                self.canvas.create_text(
-                    x,
-                    y + 15,
-                    text=f"{passenger.passenger_id[-2:]}({passenger_type})",
-                    font=("Arial", 8, "bold" if passenger.is_disabled else "normal"),
-                    fill=passenger_text_color,
-                    tags="entities",
-                )
-
-        # Dibujar taxis
-        for taxi in self.coordinator.taxis.values():
-            # Permitir dict o objeto
-            def get_attr(obj, attr):
-                if isinstance(obj, dict):
-                    return obj[attr]
-                return getattr(obj, attr)
-
-            pos = get_attr(taxi, "position")
-            x = get_attr(pos, "x") * cell_size + cell_size // 2
-            y = get_attr(pos, "y") * cell_size + cell_size // 2
-
-            # Color según estado
-            state = get_attr(taxi, "state")
-            if isinstance(state, str):
-                idle = state == "IDLE"
-            else:
-                idle = state == TaxiState.IDLE
-            if idle:
-                color = "gold"
-                outline = "orange"
-            else:
-                color = "orange"
-                outline = "darkorange"
+        # Un coordinador nuevo (reset) reutiliza los IDs de pasajeros: partir de cero
+        if self.coordinator is not self._drawn_coordinator:
+            self.canvas.delete("entities")
+            self._passenger_items.clear()
+            self._taxi_items.clear()
+            self._drawn_coordinator = self.coordinator
+
+        self._draw_passengers()
+        self._draw_taxis()
+
+    def _draw_passengers(self):
+        """Crea o elimina los ítems de pasajeros solo cuando aparecen o dejan de esperar"""
+        passengers = self.coordinator.passengers
+        waiting = {
+            passenger_id
+            for passenger_id, passenger in passengers.items()
+            if passenger.state == PassengerState.WAITING
+        }
+
+        # Pasajeros recogidos o eliminados
+        for passenger_id in self._passenger_items.keys() - waiting:
+            self.canvas.delete(*self._passenger_items.pop(passenger_id))
+
+        # Pasajeros nuevos (su origen y destino no cambian mientras esperan)
+        new_ids = waiting - self._passenger_items.keys()
+        for passenger_id in new_ids:
+            items = self._create_passenger_items(passengers[passenger_id])
+            if items is not None:
+                self._passenger_items[passenger_id] = items
+
+        # Los taxis se dibujan siempre por encima de los pasajeros
+        if new_ids:
+            self.canvas.tag_raise("taxis")
+
+    def _create_passenger_items(self, passenger) -> Optional[List[int]]:
+        """Crea los ítems del canvas de un pasajero y retorna sus IDs (None si está fuera de la grilla)"""
+        pickup = self._cell_center(passenger.pickup_position)
+        dropoff = self._cell_center(passenger.dropoff_position)
+        if pickup is None or dropoff is None:
+            logger.debug("Passenger %s outside the grid, not drawn", passenger.passenger_id)
+            return None
+
+        items = []
+        x, y = pickup
+
+        # Determinar color y forma según tipo de pasajero
+        passenger_color, passenger_outline, passenger_symbol, passenger_text_color = (
+            PASSENGER_STYLES[passenger.is_disabled]
+        )
 
-            # Taxi (diamante)
-            self.canvas.create_polygon(
-                x,
+        # Dibujar pasajero con forma apropiada
+        if passenger.is_disabled:
+            # Círculo para discapacitados
+            items.append(self.canvas.create_oval(
+                x - 8,
                 y - 8,
                 x + 8,
-                y,
-                x,
                 y + 8,
-                x - 8,
+                fill=passenger_color,
+                outline=passenger_outline,
+                width=3,
+                tags="entities",
+            ))
+            # Símbolo de silla de ruedas
+            items.append(self.canvas.create_text(
+                x,
                 y,
-                fill=color,
-                outline=outline,
+                text=passenger_symbol,
+                font=("Arial", 10, "bold"),
+                fill="white",
+                tags="entities",
+            ))
+        else:
+            # Cuadrado para normales
+            items.append(self.canvas.create_rectangle(
+                x - 6,
+                y - 6,
+                x + 6,
+                y + 6,
+                fill=passenger_color,
+                outline=passenger_outline,
                 width=2,
                 tags="entities",
-            )
+            ))
+
+        # Línea punteada al destino
+        dest_x, dest_y = dropoff
+        line_color = passenger_outline
+        items.append(self.canvas.create_line(
+            x,
+            y,
+            dest_x,
+            dest_y,
+            fill=line_color,
+            width=2 if passenger.is_disabled else 1,
+            dash=(3, 3),
+            tags="entities",
+        ))
+
+        # Destino
+        items.append(self.canvas.create_polygon(
+            dest_x,
+            dest_y - 6,
+            dest_x - 5,
+            dest_y + 4,
+            dest_x + 5,
+            dest_y + 4,
+            fill="red",
+            outline="darkred",
+            width=2,
+            tags="entities",
+        ))
+
+        # ID del pasajero con tipo
+        passenger_type = "D" if passenger.is_disabled else "N"
+        items.append(self.canvas.create_text(
+            x,
+            y + 15,
+            text=f"{passenger.passenger_id[-2:]}({passenger_type})",
+            font=("Arial", 8, "bold" if passenger.is_disabled else "normal"),
+            fill=passenger_text_color,
+            tags="entities",
+        ))
+
+        return items
+
+    def _draw_taxis(self):
+        """Dibuja los taxis moviendo sus ítems existentes en lugar de recrearlos"""
+        taxis = self.coordinator.taxis
+
+        # Taxis que ya no reporta el coordinador
+        for taxi_id in self._taxi_items.keys() - taxis.keys():
+            self.canvas.delete(*self._taxi_items.pop(taxi_id))
+
+        for taxi_id, taxi in taxis.items():
+            center = self._cell_center(_get_attr(taxi, "position"))
+            if center is None:
+                logger.debug("Taxi %s outside the grid, not drawn", taxi_id)
+                continue
+            x, y = center
+
+            # Color según estado
+            color, outline = TAXI_COLORS.get(_get_attr(taxi, "state"), BUSY_TAXI_COLORS)
+
+            items = self._taxi_items.get(taxi_id)
+            if items is None:
+                items = self._taxi_items[taxi_id] = self._create_taxi_items(taxi_id)
+            body, label, target_line = items
+
+            # Taxi (diamante)
+            self.canvas.coords(body, x, y - 8, x + 8, y, x, y + 8, x - 8, y)
+            self.canvas.itemconfig(body, fill=color, outline=outline)
 
             # ID del taxi
-            taxi_id = get_attr(taxi, "taxi_id")
-            self.canvas.create_text(
-                x,
-                y - 18,
-                text=taxi_id,
-                font=("Arial", 8, "bold"),
-                fill="black",
-                tags="entities",
-            )
+            self.canvas.coords(label, x, y - 18)
 
             # Línea hacia objetivo si existe
-            target_pos = get_attr(taxi, "target_position")
-            if target_pos:
-                target_x = get_attr(target_pos, "x") * cell_size + cell_size // 2
-                target_y = get_attr(target_pos, "y") * cell_size + cell_size // 2
-                self.canvas.create_line(
-                    x,
-                    y,
-                    target_x,
-                    target_y,
-                    fill=color,
-                    width=2,
-                    dash=(5, 5),
-                    tags="entities",
-                )
+            target_pos = _get_attr(taxi, "target_position")
+            target = self._cell_center(target_pos) if target_pos else None
+            if target:
+                target_x, target_y = target
+                self.canvas.coords(target_line, x, y, target_x, target_y)
+                self.canvas.itemconfig(target_line, fill=color, state=tk.NORMAL)
+            else:
+                self.canvas.itemconfig(target_line, state=tk.HIDDEN)
+
+    def _create_taxi_items(self, taxi_id: str) -> Tuple[int, int, int]:
+        """Crea los ítems del canvas de un taxi; se posicionan en cada frame"""
+        tags = ("entities", "taxis")
+
+        # Línea hacia el objetivo (debajo del taxi, oculta hasta tener objetivo)
+        target_line = self.canvas.create_line(
+            0, 0, 0, 0, width=2, dash=(5, 5), state=tk.HIDDEN, tags=tags
+        )
+        body = self.canvas.create_polygon(
+            0, 0, 0, 0, 0, 0, 0, 0, width=2, tags=tags
+        )
+        label = self.canvas.create_text(
+            0,
+            0,
+            text=taxi_id,
+            font=("Arial", 8, "bold"),
+            fill="black",
+            tags=tags,
+        )
+        return body, label, target_line
 
     def _start_system(self):
         """Inicia el sistema distribuido"""
@@ -422,9 +493,16 @@ class GridTaxiGUI:
             return
 
         try:
+            # Estado de la ejecución listo antes de arrancar el hilo: un Detener o
+            # Reiniciar pulsado mientras el loop arranca no se pierde
+            self._stop_requested = threading.Event()
+            self.running = True
+
             # Iniciar sistema en hilo separado
             self.system_thread = threading.Thread(
-                target=self._run_distributed_system, daemon=True
+                target=self._run_distributed_system,
+                args=(self._stop_requested,),
+                daemon=True,
             )
             self.system_thread.start()
 
@@ -432,12 +510,23 @@ class GridTaxiGUI:
             logger.info("Starting distributed taxi system")
 
         except Exception as e:
+            self.running = False
             messagebox.showerror("Error", f"Error al iniciar sistema: {e}")
             logger.error(f"Failed to start system: {e}")
 
     def _stop_system(self):
         """Detiene el sistema"""
         self.running = False
+        if self._stop_requested:
+            self._stop_requested.set()
+        # Despertar al loop del sistema (si está activo) para que cierre el coordinador;
+        # si aún no publicó su loop, verá el pedido de parada al publicarlo
+        loop, stop_event = self._system_loop, self._stop_event
+        if loop and stop_event:
+            try:
+                loop.call_soon_threadsafe(stop_event.set)
+            except RuntimeError:
+                pass  # El loop ya terminó
         self.status_text.set("Sistema detenido")
         # Actualizar estadísticas para reflejar que el sistema se detuvo
         self._update_stats()
@@ -445,43 +534,56 @@ class GridTaxiGUI:
 
     def _reset_system(self):
         """Reinicia el sistema"""
+        if self._reset_pending:
+            return
+        self._reset_pending = True
         self._stop_system()
-        time.sleep(1)
+        self.status_text.set("Reiniciando sistema...")
+        self._finish_reset()
+
+    def _finish_reset(self):
+        """Arranca el sistema cuando el hilo anterior terminó, sin bloquear el mainloop"""
+        if self.system_thread and self.system_thread.is_alive():
+            self.root.after(100, self._finish_reset)
+            return
+        self._reset_pending = False
         self._start_system()
 
-    def _run_distributed_system(self):
+    def _run_distributed_system(self, stop_requested: threading.Event):
         """Ejecuta el sistema distribuido en hilo separado"""
-        loop = None
         try:
-            # Crear nuevo event loop para este hilo
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            # Ejecutar sistema async
-            loop.run_until_complete(self._async_system_main())
+            # asyncio.run crea, asigna y cierra el event loop de este hilo
+            asyncio.run(self._async_system_main(stop_requested))
 
         except Exception as e:
             logger.error(f"System error: {e}")
             self.status_text.set(f"Error en sistema: {e}")
-        finally:
-            if loop and not loop.is_closed():
-                loop.close()
 
-    async def _async_system_main(self):
+    async def _async_system_main(self, stop_requested: threading.Event):
         """Main async del sistema distribuido"""
         try:
-            self.running = True
+            loop = asyncio.get_running_loop()
+            # Evento de parada: _stop_system lo activa desde el hilo de Tk
+            self._stop_event = asyncio.Event()
+            self._system_loop = loop
+            # Publicado el loop: una parada pedida antes ya no llegará por él
+            if stop_requested.is_set():
+                return
 
-            # Verificar OpenFire
-            if not self._check_openfire():
+            # Verificar OpenFire (bloqueante, fuera del event loop)
+            if not await loop.run_in_executor(None, self._check_openfire):
                 self.status_text.set("Error: OpenFire no disponible")
                 return
 
             # Crear coordinador
             try:
                 # Crear usuario coordinador
-                openfire_api.create_user(
-                    "coordinator", "coordinator_pass", "Coordinator Agent"
+                await loop.run_in_executor(
+                    None,
+                    openfire_api.create_user,
+                    "coordinator",
+                    "coordinator_pass",
+                    "Coordinator Agent",
                 )
 
                 logger.info("XMPP users created")
@@ -496,40 +598,38 @@ class GridTaxiGUI:
 
             self.status_text.set("Sistema activo - Agentes conectados")
 
-            # Loop principal con actualización de estadísticas
-            last_update = time.time()
-            last_stats_update = time.time()
-            
-            while self.running:
-                current_time = time.time()
-                dt = current_time - last_update
-
-                # Actualizar estadísticas cada segundo
-                if current_time - last_stats_update >= 1.0:
-                    self.root.after(0, self._update_stats)  # Ejecutar en hilo principal
-                    last_stats_update = current_time
-
-                last_update = current_time
-                await asyncio.sleep(0.05)  # 20 FPS
+            # Mantener el coordinador vivo hasta que se pida detener el sistema
+            if not stop_requested.is_set():
+                await self._stop_event.wait()
 
         except Exception as e:
             logger.error(f"Async system error: {e}")
             self.status_text.set(f"Error: {e}")
         finally:
-            # Cleanup
+            # Cleanup: el loop se cierra al salir, no debe quedar publicado
+            self._system_loop = None
+            self._stop_event = None
             self.running = False
+            # Detener el coordinador en su propio loop antes de cerrarlo
+            if self.coordinator:
+                try:
+                    await self.coordinator.stop()
+                except Exception as e:
+                    logger.error(f"Error stopping coordinator: {e}")
 
     def _check_openfire(self) -> bool:
         """Verifica conexión con OpenFire"""
+        conn = http.client.HTTPConnection(
+            config.openfire_host, config.openfire_port, timeout=5
+        )
         try:
-            import requests
-
-            response = requests.get(
-                f"http://{config.openfire_host}:{config.openfire_port}", timeout=5
-            )
-            return response.status_code == 200
-        except:
+            # HEAD evita descargar la consola web; las redirecciones (login) cuentan como activo
+            conn.request("HEAD", "/")
+            return conn.getresponse().status < 400
+        except (OSError, http.client.HTTPException):
             return False
+        finally:
+            conn.close()
 
     def _update_stats(self):
         """Actualiza estadísticas de la GUI"""
@@ -541,47 +641,40 @@ class GridTaxiGUI:
                 # Contar pasajeros totales
                 passenger_count = len(self.coordinator.passengers) if self.coordinator.passengers else 0
                 
-                # Contar pasajeros esperando
-                waiting_count = 0
-                if self.coordinator.passengers:
-                    for passenger in self.coordinator.passengers.values():
-                        try:
-                            if hasattr(passenger, 'state'):
-                                if passenger.state == PassengerState.WAITING:
-                                    waiting_count += 1
-                            elif isinstance(passenger, dict) and passenger.get('state') == 'WAITING':
-                                waiting_count += 1
-                        except:
-                            continue
-                
-                # Actualizar variables de la GUI
-                self.taxi_count.set(str(taxi_count))
-                self.passenger_count.set(str(passenger_count))
-                self.waiting_passengers.set(str(waiting_count))
+                # Pasajeros esperando: el coordinador mantiene el conjunto actualizado
+                waiting_count = len(self.coordinator.waiting_passenger_ids)
                 
-                # Actualizar estado del solver
-                if self.running:
-                    self.solver_type.set("OR-Tools Activo")
-                else:
-                    self.solver_type.set("OR-Tools Inactivo")
+                # Estado del solver
+                solver_status = "OR-Tools Activo" if self.running else "OR-Tools Inactivo"
+                stats = (str(taxi_count), str(passenger_count), str(waiting_count), solver_status)
                 
             else:
                 # Sistema no iniciado o sin datos
-                self.taxi_count.set("0")
-                self.passenger_count.set("0")
-                self.waiting_passengers.set("0")
-                if self.running:
-                    self.solver_type.set("Iniciando...")
-                else:
-                    self.solver_type.set("Sistema Detenido")
+                solver_status = "Iniciando..." if self.running else "Sistema Detenido"
+                stats = ("0", "0", "0", solver_status)
                     
         except Exception as e:
             logger.error(f"Error updating stats: {e}")
             # Valores por defecto en caso de error
-            self.taxi_count.set("--")
-            self.passenger_count.set("--")
-            self.waiting_passengers.set("--")
-            self.solver_type.set("Error")
+            stats = ("--", "--", "--", "Error")
+
+        self._apply_stats(stats)
+
+    def _apply_stats(self, stats: Tuple[str, str, str, str]):
+        """Actualiza solo las variables de la GUI cuyo valor cambió"""
+        if stats == self._shown_stats:
+            return
+
+        variables = (self.taxi_count, self.passenger_count, self.waiting_passengers, self.solver_type)
+        for variable, value, shown in zip(variables, stats, self._shown_stats):
+            if value != shown:
+                variable.set(value)
+        self._shown_stats = stats
+
+    def _stats_tick(self):
+        """Refresca las estadísticas cada segundo desde el mainloop de Tk"""
+        self._update_stats()
+        self.root.after(1000, self._stats_tick)
 
     def _update_clock(self):
         """Actualiza el reloj"""
@@ -591,36 +684,28 @@ class GridTaxiGUI:
         self.clock_text.set(now.strftime("%H:%M:%S"))
         self.root.after(1000, self._update_clock)
 
-    def _start_update_thread(self):
-        """Inicia hilo de actualización visual"""
-
-        def update_loop():
-            last_stats_update = time.time()
-            while True:
-                try:
-                    current_time = time.time()
-                    
-                    if self.running and self.coordinator:
-                        # Programar actualización visual en hilo principal
-                        self.root.after(0, self._draw_entities)
-                        
-                        # También actualizar estadísticas cada segundo
-                        if current_time - last_stats_update >= 1.0:
-                            self.root.after(0, self._update_stats)
-                            last_stats_update = current_time
-                    else:
-                        # Actualizar estadísticas incluso cuando no está corriendo
-                        if current_time - last_stats_update >= 2.0:
-                            self.root.after(0, self._update_stats)
-                            last_stats_update = current_time
-                    
-                    time.sleep(1 / config.fps)  # 20 FPS para visualización
-                except Exception as e:
-                    logger.error(f"Update thread error: {e}")
-                    time.sleep(1)
+    def _render_tick(self):
+        """Redibuja desde el mainloop de Tk a config.fps, solo si el coordinador cambió"""
+        try:
+            coordinator = self.coordinator
+            if (
+                self.running
+                and coordinator
+                and (id(coordinator), coordinator.version) != self._drawn_version
+                # Ventana minimizada: no dibujar; la versión queda pendiente hasta que se restaure
+                and self.root.state() != "iconic"
+            ):
+                # Versión leída antes de dibujar (un cambio durante el dibujo queda pendiente)
+                # y registrada solo si el dibujo termina: un fallo se reintenta en el siguiente frame
+                version = (id(coordinator), coordinator.version)
+                self._draw_entities()
+                self._drawn_version = version
+                # Procesar de una vez el redibujado pendiente de todos los ítems movidos
+                self.canvas.update_idletasks()
+        except Exception as e:
+            logger.error(f"Render tick error: {e}")
 
-        update_thread = threading.Thread(target=update_loop, daemon=True)
-        update_thread.start()
+        self.root.after(self._frame_ms, self._render_tick)
 
     def _on_closing(self):
         """Maneja cierre de ventana"""
@@ -1,4 +1,5 @@
 import subprocess
+import threading
 import time
 import psutil
 import sys
@@ -9,14 +10,45 @@ import json
 class HostLimitTester:
     def __init__(self):
         self.log_file = "comparador_multi_host.log"
-        open(self.log_file, 'w').close()
+        # Un solo descriptor para todo el log (line-buffered) en vez de abrir por línea
+        self._log = open(self.log_file, 'w', encoding='utf-8', buffering=1)
+        # Cada prueba se escribe al terminar: los resultados parciales sobreviven a un Ctrl+C
+        self.steps_file = "comparacion_multi_host_pasos.jsonl"
+        self._steps = open(self.steps_file, 'w', encoding='utf-8', buffering=1)
+        self._memory_percent = psutil.virtual_memory().percent
+        self._memory_lock = threading.Lock()
+        self._stop_sampler = threading.Event()
+        self._sampler = self._start_memory_sampler()
+
+    def _start_memory_sampler(self, interval=1.0):
+        """Muestrea la memoria en segundo plano (~1 Hz) para no llamar psutil en cada vuelta"""
+        def sample():
+            while not self._stop_sampler.is_set():
+                percent = psutil.virtual_memory().percent
+                with self._memory_lock:
+                    self._memory_percent = percent
+                self._stop_sampler.wait(interval)
+
+        thread = threading.Thread(target=sample, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Detiene el muestreo de memoria y cierra los archivos de resultados y el log"""
+        self._stop_sampler.set()
+        self._sampler.join()
+        self._steps.close()
+        self._log.close()
+
+    def memory_percent(self):
+        with self._memory_lock:
+            return self._memory_percent
 
     def log(self, message):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         line = f"[{timestamp}] {message}"
         print(line)
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(line + '\n')
+        self._log.write(line + '\n')
 
     def run_host_test(self, num_hosts, agents_per_host, test_duration=20):
         self.log(f"Prueba: {num_hosts} hosts, {agents_per_host} agentes/host")
@@ -31,10 +63,9 @@ class HostLimitTester:
 
         print("Iniciando prueba de creacion de agentes...")
         memory_limit = False
-        while not memory_limit and any(a < agents_per_host for a in agents_ready):
-            print(psutil.virtual_memory().percent)
-            print(type(psutil.virtual_memory().percent))
-            if psutil.virtual_memory().percent >= 85.0:
+        total_created, pending_hosts = 0, num_hosts
+        while not memory_limit and pending_hosts:
+            if self.memory_percent() >= 85.0:
                 memory_limit = True
                 break
             for idx, (name, proc) in enumerate(processes):
@@ -45,9 +76,11 @@ class HostLimitTester:
                         if not line: break
                         if "Taxi agent" in line and "created" in line:
                             agents_ready[idx] += 1
+                            total_created += 1
+                            if agents_ready[idx] == agents_per_host:
+                                pending_hosts -= 1
                 except: pass
 
-        total_created = sum(agents_ready)
         for name, proc in processes:
             try:
                 proc.terminate()
@@ -56,7 +89,14 @@ class HostLimitTester:
                 proc.kill()
 
         success = total_created == total_agents and not memory_limit
-        return {'success': success, 'total_agents': total_agents, 'agents_created': total_created, 'memory_limited': memory_limit}
+        result = {'success': success, 'total_agents': total_agents, 'agents_created': total_created, 'memory_limited': memory_limit}
+        self.record_step(num_hosts, agents_per_host, result)
+        return result
+
+    def record_step(self, num_hosts, agents_per_host, result):
+        step = {'hosts': num_hosts, 'agents_per_host': agents_per_host, **result}
+        self._steps.write(json.dumps(step) + '\n')
+        self._steps.flush()
 
     def find_limit_for_hosts(self, num_hosts):
         min_agents, max_agents = 2, 10000
@@ -101,7 +141,10 @@ class HostLimitTester:
         self.log("Reporte guardado: comparacion_multi_host.json")
 
 if __name__ == "__main__":
+    tester = HostLimitTester()
     try:
-        HostLimitTester().run_comparison()
+        tester.run_comparison()
     except KeyboardInterrupt:
         print("Interrumpido por el usuario")
+    finally:
+        tester.close()
@@ -1,7 +1,10 @@
 import logging
 
 # ==================== LOGGER GLOBAL ====================
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+def configure_logging(level: int = logging.INFO):
+    """Configura el logging raíz desde el punto de entrada, no al importar"""
+    logging.basicConfig(
+        level=level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("spade")
+pytest.importorskip("ortools")
+pytest.importorskip("requests")
+
+from spade.message import Message
+
+from src.agent.coordinator import CoordinatorAgent
+from src.agent.libs.environment import (
+    GridNetwork,
+    GridPosition,
+    PassengerInfo,
+    PassengerState,
+)
+
+
+class CountingSolver:
+    """Solver que no asigna nada y cuenta las rondas resueltas"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def solve_assignment(self, taxis, passengers):
+        self.calls += 1
+        return {}
+
+
+def make_coordinator():
+    coordinator = CoordinatorAgent("coordinator@localhost", "secret", GridNetwork(10, 10))
+    coordinator.solver = CountingSolver()
+
+    assignment = CoordinatorAgent.AssignmentBehaviour(period=1)
+    assignment.set_agent(coordinator)
+    communication = CoordinatorAgent.CommunicationBehaviour()
+    communication.set_agent(coordinator)
+    return coordinator, assignment, communication
+
+
+def add_waiting_passenger(coordinator, passenger_id):
+    coordinator.passengers[passenger_id] = PassengerInfo(
+        passenger_id=passenger_id,
+        pickup_position=GridPosition(9, 9),
+        dropoff_position=GridPosition(0, 9),
+        state=PassengerState.WAITING,
+        wait_time=0.0,
+    )
+    coordinator.waiting_passenger_ids.add(passenger_id)
+    coordinator.unassigned_passenger_ids.add(passenger_id)
+
+
+def status_report(taxi_id, x, y):
+    msg = Message(to="coordinator@localhost")
+    msg.set_metadata("performative", "inform")
+    msg.set_metadata("type", "status_report")
+    msg.body = json.dumps(
+        {
+            "taxi_id": taxi_id,
+            "position": {"x": x, "y": y},
+            "target_position": None,
+            "state": "idle",
+            "capacity": 4,
+            "current_passengers": 0,
+        }
+    )
+    return msg
+
+
+def test_round_is_skipped_when_nothing_relevant_changed():
+    coordinator, assignment, communication = make_coordinator()
+    add_waiting_passenger(coordinator, "P0")
+
+    async def scenario():
+        await communication._handle_message(status_report("T1", 0, 0))
+        await assignment.run()
+        assert coordinator.solver.calls == 1
+
+        # Mismo estado: la ronda no se vuelve a resolver
+        await assignment.run()
+        assert coordinator.solver.calls == 1
+
+        # El pasajero ya tiene taxi: que un taxi libre se mueva no es relevante
+        coordinator.passengers["P0"].assigned_taxi_id = "T2"
+        coordinator.unassigned_passenger_ids.discard("P0")
+        await communication._handle_message(status_report("T1", 1, 0))
+        assert not coordinator.assignment_dirty
+        await assignment.run()
+        assert coordinator.solver.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_idle_taxi_move_resolves_while_a_passenger_is_unassigned():
+    coordinator, assignment, communication = make_coordinator()
+    add_waiting_passenger(coordinator, "P0")
+
+    async def scenario():
+        await communication._handle_message(status_report("T1", 0, 0))
+        await assignment.run()
+        assert coordinator.solver.calls == 1
+
+        # El taxi patrulla con un pasajero todavía sin asignar: volver a resolver
+        await communication._handle_message(status_report("T1", 1, 0))
+        assert coordinator.assignment_dirty
+        await assignment.run()
+        assert coordinator.solver.calls == 2
+
+    asyncio.run(scenario())